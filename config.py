@@ -16,8 +16,10 @@ class Config:
     OUTPUT_DIR = os.getenv("OUTPUT_DIR", default_output)
     
     # Performance settings
-    MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))  # Thread pool size
+    MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))  # Worker process pool size
     MAX_MEMORY_MB = int(os.getenv("MAX_MEMORY_MB", "200"))  # Memory limit
+    WORKER_MEMORY_MB = int(os.getenv("WORKER_MEMORY_MB", "60"))  # Peak memory per worker process
+    CONTROLLER_MEMORY_MB = int(os.getenv("CONTROLLER_MEMORY_MB", "20"))  # Memory of the controller process
     TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", "10"))  # Per-file timeout
     
     # Processing settings
@@ -62,6 +64,12 @@ class Config:
         
         if cls.MAX_MEMORY_MB < 50:
             raise ValueError("MAX_MEMORY_MB must be >= 50")
+        
+        if cls.WORKER_MEMORY_MB < 1:
+            raise ValueError("WORKER_MEMORY_MB must be >= 1")
+        
+        if cls.CONTROLLER_MEMORY_MB < 0:
+            raise ValueError("CONTROLLER_MEMORY_MB must be >= 0")
     
     @classmethod
     def get_summary(cls) -> dict:
@@ -71,6 +79,8 @@ class Config:
             "output_dir": cls.OUTPUT_DIR,
             "max_workers": cls.MAX_WORKERS,
             "max_memory_mb": cls.MAX_MEMORY_MB,
+            "worker_memory_mb": cls.WORKER_MEMORY_MB,
+            "controller_memory_mb": cls.CONTROLLER_MEMORY_MB,
             "timeout_seconds": cls.TIMEOUT_SECONDS,
             "max_pages_for_analysis": cls.MAX_PAGES_FOR_ANALYSIS,
             "max_outline_items": cls.MAX_OUTLINE_ITEMS,
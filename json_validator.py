@@ -4,30 +4,47 @@ JSON validation module for ensuring output conforms to the required schema.
 
 import json
 import logging
-from typing import Dict, Any, List
+from typing import Annotated, Dict, Any, List, Literal
 from pathlib import Path
 
+try:
+    import msgspec
+except ImportError:  # Optional accelerator, fall back to manual checks
+    msgspec = None
+
 logger = logging.getLogger(__name__)
 
 
+if msgspec is not None:
+    class OutlineItem(msgspec.Struct):
+        """A single outline entry of the output document."""
+        level: Literal["h1", "h2", "h3", "h4", "h5", "h6"]
+        text: Annotated[str, msgspec.Meta(max_length=1000, pattern=r"\S")]
+        page: Annotated[int, msgspec.Meta(ge=1)]
+    
+    class OutputDocument(msgspec.Struct):
+        """Output document written for each PDF."""
+        title: Annotated[str, msgspec.Meta(max_length=500)]
+        outline: List[OutlineItem]
+
+
 class JSONValidator:
     """Validates extracted data against the required JSON schema."""
     
-    def __init__(self):
-        # Define the expected schema structure
-        self.schema = {
-            "title": str,
-            "outline": list
-        }
-        
-        self.outline_item_schema = {
-            "level": str,
-            "text": str,
-            "page": int
-        }
-        
-        # Valid level values
-        self.valid_levels = {"h1", "h2", "h3", "h4", "h5", "h6"}
+    # Expected schema structure
+    schema = {
+        "title": str,
+        "outline": list
+    }
+    
+    outline_item_schema = {
+        "level": str,
+        "text": str,
+        "page": int
+    }
+    
+    # Valid level values
+    valid_levels = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
     
     def validate(self, data: Dict[str, Any]) -> bool:
         """
@@ -39,6 +56,16 @@ class JSONValidator:
         Returns:
             True if valid, False otherwise
         """
+        if msgspec is not None:
+            try:
+                msgspec.convert(data, OutputDocument)
+            except msgspec.ValidationError as e:
+                logger.error(f"Validation failed: {e}")
+                return False
+            
+            logger.debug("Validation successful")
+            return True
+        
         try:
             # Check top-level structure
             if not isinstance(data, dict):
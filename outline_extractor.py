@@ -3,12 +3,20 @@ Outline extraction module for PDF documents.
 Extracts hierarchical document structure from bookmarks and content analysis.
 """
 
-import fitz
+from __future__ import annotations
+
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from operator import itemgetter
+from statistics import median
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+
+from config import Config
+from utils import (clean_text, normalize_level, detect_heading_level, filter_outline_items,
+                   PageDictCache, BOLD_FLAG, LEVEL_NAMES, LEVEL_NUMBERS)
 
-from utils import clean_text, normalize_level, detect_heading_level
+if TYPE_CHECKING:
+    import fitz
 
 logger = logging.getLogger(__name__)
 
@@ -16,33 +24,29 @@ logger = logging.getLogger(__name__)
 class OutlineExtractor:
     """Extracts document outlines from PDF files."""
     
-    def __init__(self):
-        # Heading patterns for content-based extraction
-        self.heading_patterns = [
-            r'^(\d+\.?\s+.+)',  # "1. Heading" or "1 Heading"
-            r'^([IVX]+\.?\s+.+)',  # Roman numerals
-            r'^([A-Z]\.?\s+.+)',  # "A. Heading"
-            r'^(Chapter\s+\d+.+)',  # "Chapter 1 Title"
-            r'^(Section\s+\d+.+)',  # "Section 1 Title"
-            r'^(\d+\.\d+\s+.+)',  # "1.1 Subheading"
-            r'^(\d+\.\d+\.\d+\s+.+)',  # "1.1.1 Sub-subheading"
-        ]
-        
-        # Level indicators
-        self.level_indicators = {
-            'chapter': 'h1',
-            'section': 'h2',
-            'subsection': 'h3',
-            'part': 'h1',
-            'appendix': 'h2'
-        }
+    # Heading patterns for content-based extraction, compiled once per process
+    heading_patterns = tuple(re.compile(p, re.IGNORECASE) for p in (
+        r'^(\d+\.?\s+.+)',  # "1. Heading" or "1 Heading"
+        r'^([IVX]+\.?\s+.+)',  # Roman numerals
+        r'^([A-Z]\.?\s+.+)',  # "A. Heading"
+        r'^(Chapter\s+\d+.+)',  # "Chapter 1 Title"
+        r'^(Section\s+\d+.+)',  # "Section 1 Title"
+        r'^(\d+\.\d+\s+.+)',  # "1.1 Subheading"
+        r'^(\d+\.\d+\.\d+\s+.+)',  # "1.1.1 Sub-subheading"
+    ))
+    
+    # Level indicators
+    level_indicators = ('chapter', 'section', 'subsection', 'part', 'appendix')
+    level_indicator_pattern = re.compile('|'.join(level_indicators), re.IGNORECASE)
     
-    def extract_outline(self, doc: fitz.Document) -> List[Dict[str, Any]]:
+    def extract_outline(self, doc: fitz.Document,
+                        page_dicts: Optional[PageDictCache] = None) -> List[Dict[str, Any]]:
         """
         Extract document outline using multiple strategies.
         
         Args:
             doc: PyMuPDF document object
+            page_dicts: Optional cache of parsed page text shared with other extractors
             
         Returns:
             List of outline items with level, text, and page
@@ -54,7 +58,9 @@ class OutlineExtractor:
             return outline
         
         # Strategy 2: Content analysis
-        outline = self._extract_from_content(doc)
+        if page_dicts is None:
+            page_dicts = PageDictCache(doc)
+        outline = self._extract_from_content(doc, page_dicts)
         if outline:
             logger.debug(f"Outline extracted from content: {len(outline)} items")
             return outline
@@ -98,19 +104,30 @@ class OutlineExtractor:
             logger.debug(f"Error extracting outline from bookmarks: {str(e)}")
             return []
     
-    def _extract_from_content(self, doc: fitz.Document) -> List[Dict[str, Any]]:
+    def _extract_from_content(self, doc: fitz.Document, page_dicts: PageDictCache) -> List[Dict[str, Any]]:
         """Extract outline by analyzing document content."""
         try:
             outline = []
             
+            # Collect spans from every analyzed page up front
+            page_count = min(doc.page_count, Config.MAX_PAGES_FOR_ANALYSIS)
+            page_spans = [self._collect_spans(page_dicts, page_num)
+                          for page_num in range(page_count)]
+            
+            # Body text size across the whole document; the median is not
+            # skewed by a few large headings or a title-dominated first page
+            all_sizes = [size for spans in page_spans for size in spans[1]]
+            body_font_size = median(all_sizes) if all_sizes else 12.0
+            
             # Analyze text formatting to find headings
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                headings = self._find_headings_on_page(page, page_num + 1)
+            for page_num, spans in enumerate(page_spans, start=1):
+                headings = self._find_headings_on_page(spans, page_num, body_font_size)
                 outline.extend(headings)
             
-            # Filter and refine the outline
+            # Filter and refine the outline, then keep the highest-level
+            # items across all scanned pages within the item limit
             outline = self._refine_outline(outline)
+            outline = filter_outline_items(outline, Config.MAX_OUTLINE_ITEMS)
             
             return outline
             
@@ -118,47 +135,71 @@ class OutlineExtractor:
             logger.debug(f"Error extracting outline from content: {str(e)}")
             return []
     
-    def _find_headings_on_page(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
-        """Find potential headings on a single page."""
+    def _collect_spans(self, page_dicts: PageDictCache, page_num: int) -> Tuple[List[str], List[float], List[int], List[float]]:
+        """Collect a page's non-empty span texts, sizes, flags and y positions as parallel lists."""
+        texts = []
+        sizes = []
+        flags = []
+        ys = []
+        
+        # Bind the append methods once instead of looking them up per span
+        add_text = texts.append
+        add_size = sizes.append
+        add_flags = flags.append
+        add_y = ys.append
+        
+        try:
+            # A page whose text cannot be extracted contributes no spans.
+            # Everything needed is copied out below, so the cached page
+            # dict is released rather than held until the document closes
+            page_dict = page_dicts.pop(page_num)
+            all_spans = (
+                span
+                for block in page_dict.get("blocks", ())
+                if "lines" in block
+                for line in block["lines"]
+                for span in line["spans"]
+            )
+            for span in all_spans:
+                # MuPDF always provides these keys; skip malformed spans
+                # before appending so the parallel lists stay aligned
+                try:
+                    text = span["text"].strip()
+                    if not text:
+                        continue
+                    size = span["size"]
+                    span_flags = span["flags"]
+                    y = span["bbox"][1]
+                except (KeyError, IndexError, TypeError, AttributeError):
+                    continue
+                add_text(text)
+                add_size(size)
+                add_flags(span_flags)
+                add_y(y)
+        except Exception as e:
+            logger.debug(f"Error collecting spans on page {page_num + 1}: {str(e)}")
+        
+        return texts, sizes, flags, ys
+    
+    def _find_headings_on_page(self, spans: Tuple[List[str], List[float], List[int], List[float]],
+                               page_num: int, body_font_size: float) -> List[Dict[str, Any]]:
+        """Find potential headings among a single page's spans."""
         headings = []
+        texts, sizes, flags, ys = spans
         
         try:
-            # Get text with formatting
-            page_dict = page.get_text("dict")
+            # Visit spans by vertical position
+            order = sorted(range(len(texts)), key=ys.__getitem__)
             
-            # Collect all text spans with their properties
-            text_spans = []
-            for block in page_dict.get("blocks", []):
-                if "lines" not in block:
-                    continue
-                
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span.get("text", "").strip()
-                        if text:
-                            text_spans.append({
-                                "text": text,
-                                "font": span.get("font", ""),
-                                "size": span.get("size", 0),
-                                "flags": span.get("flags", 0),
-                                "bbox": span.get("bbox", []),
-                                "y": span.get("bbox", [0, 0, 0, 0])[1]
-                            })
-            
-            # Sort by vertical position
-            text_spans.sort(key=lambda x: x["y"])
-            
-            # Find potential headings
-            avg_font_size = self._calculate_average_font_size(text_spans)
-            
-            for span in text_spans:
-                text = span["text"]
-                font_size = span["size"]
-                flags = span["flags"]
+            size_threshold = body_font_size * 1.2
+            
+            for i in order:
+                text = texts[i]
+                font_size = sizes[i]
                 
                 # Check if this looks like a heading
-                if self._is_likely_heading(text, font_size, flags, avg_font_size):
-                    level = detect_heading_level(text, font_size, flags, avg_font_size)
+                if self._is_likely_heading(text, font_size, flags[i], size_threshold):
+                    level = detect_heading_level(text, font_size, flags[i], body_font_size)
                     
                     headings.append({
                         "level": level,
@@ -171,38 +212,28 @@ class OutlineExtractor:
         
         return headings
     
-    def _calculate_average_font_size(self, text_spans: List[Dict[str, Any]]) -> float:
-        """Calculate the average font size on the page."""
-        if not text_spans:
-            return 12.0
-        
-        total_size = sum(span["size"] for span in text_spans)
-        return total_size / len(text_spans)
-    
-    def _is_likely_heading(self, text: str, font_size: float, flags: int, avg_font_size: float) -> bool:
+    def _is_likely_heading(self, text: str, font_size: float, flags: int, size_threshold: float) -> bool:
         """Determine if text is likely a heading."""
         # Must be reasonably short
         if len(text) < 3 or len(text) > 200:
             return False
         
-        # Font size significantly larger than average
-        if font_size > avg_font_size * 1.2:
+        # Font size significantly larger than the body text size
+        if font_size > size_threshold:
             return True
         
         # Bold text that's not too long
-        if (flags & 2**4) and len(text) < 100:  # Bold flag
+        if (flags & BOLD_FLAG) and len(text) < 100:
             return True
         
         # Matches heading patterns
         for pattern in self.heading_patterns:
-            if re.match(pattern, text, re.IGNORECASE):
+            if pattern.match(text):
                 return True
         
         # Contains level indicators
-        lower_text = text.lower()
-        for indicator in self.level_indicators:
-            if indicator in lower_text:
-                return True
+        if self.level_indicator_pattern.search(text):
+            return True
         
         return False
     
@@ -211,18 +242,14 @@ class OutlineExtractor:
         if not outline:
             return []
         
-        # Remove duplicates
-        seen = set()
-        refined = []
-        
+        # Remove duplicates, keeping the first occurrence in insertion order
+        seen = {}
         for item in outline:
-            key = (item["text"].lower(), item["page"])
-            if key not in seen:
-                seen.add(key)
-                refined.append(item)
+            seen.setdefault((item["text"].lower(), item["page"]), item)
+        refined = list(seen.values())
         
         # Sort by page number
-        refined.sort(key=lambda x: x["page"])
+        refined.sort(key=itemgetter("page"))
         
         # Ensure reasonable hierarchy
         refined = self._fix_hierarchy(refined)
@@ -234,21 +261,17 @@ class OutlineExtractor:
         if not outline:
             return []
         
-        # Convert level strings to numbers for processing
-        level_map = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
-        reverse_map = {1: "h1", 2: "h2", 3: "h3", 4: "h4", 5: "h5", 6: "h6"}
-        
         # Track current level
         current_level = 1
         
         for item in outline:
-            level_num = level_map.get(item["level"], 1)
+            level_num = LEVEL_NUMBERS.get(item["level"], 1)
             
             # Don't allow jumps of more than 1 level
             if level_num > current_level + 1:
                 level_num = current_level + 1
             
-            item["level"] = reverse_map.get(level_num, "h1")
+            item["level"] = LEVEL_NAMES[level_num]
             current_level = level_num
         
         return outline
@@ -3,14 +3,18 @@ Core PDF processing module for extracting titles and outlines.
 Uses PyMuPDF (fitz) for high-performance PDF parsing.
 """
 
-import fitz  # PyMuPDF
+from __future__ import annotations
+
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 
 from title_extractor import TitleExtractor
 from outline_extractor import OutlineExtractor
-from utils import clean_text, normalize_level
+from utils import clean_text, normalize_level, PageDictCache
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
 
 logger = logging.getLogger(__name__)
 
@@ -32,22 +36,30 @@ class PDFProcessor:
         Returns:
             Dictionary containing title and outline data
         """
+        # Pool workers load PyMuPDF in their initializer, so this is only a
+        # module lookup and the controller process never imports it
+        import fitz  # PyMuPDF
+        
         logger.debug(f"Opening PDF: {pdf_path}")
         
         try:
-            # Open PDF document
-            with fitz.open(str(pdf_path)) as doc:
+            # Read the file once and let PyMuPDF parse it from memory
+            data = pdf_path.read_bytes()
+            with fitz.open(stream=data, filetype="pdf") as doc:
                 # Validate document
                 if doc.is_closed or doc.page_count == 0:
                     raise ValueError("Invalid or empty PDF document")
                 
                 logger.debug(f"PDF opened successfully: {doc.page_count} pages")
                 
+                # Share parsed page text between both extractors
+                page_dicts = PageDictCache(doc)
+                
                 # Extract title
-                title = self.title_extractor.extract_title(doc)
+                title = self.title_extractor.extract_title(doc, page_dicts=page_dicts)
                 
                 # Extract outline
-                outline = self.outline_extractor.extract_outline(doc)
+                outline = self.outline_extractor.extract_outline(doc, page_dicts=page_dicts)
                 
                 # Construct result
                 result = {
@@ -3,16 +3,29 @@ Title extraction module for PDF documents.
 Attempts multiple strategies to find the document title.
 """
 
-import fitz
+from __future__ import annotations
+
 import re
 import logging
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, NamedTuple
+
+from utils import clean_text, is_likely_title, is_non_title, PageDictCache, BOLD_FLAG
 
-from utils import clean_text, is_likely_title
+if TYPE_CHECKING:
+    import fitz
 
 logger = logging.getLogger(__name__)
 
 
+class TextSpan(NamedTuple):
+    """Non-empty text span with the formatting used for title detection."""
+    text: str
+    size: float
+    flags: int
+    y: float
+    font: str
+
+
 class TitleExtractor:
     """Extracts document titles from PDF files using multiple strategies."""
     
@@ -30,43 +43,67 @@ class TitleExtractor:
             'contents', 'index', 'appendix', 'bibliography',
             'abstract', 'introduction', 'conclusion'
         }
+        self._ignore_re = re.compile('|'.join(map(re.escape, sorted(self.ignore_words))))
+        
+        # Per-call cache of formatted spans, keyed by page number
+        self._block_cache: Dict[int, List[TextSpan]] = {}
     
-    def extract_title(self, doc: fitz.Document) -> str:
+    def extract_title(self, doc: fitz.Document, page_dicts: Optional[PageDictCache] = None) -> str:
         """
         Extract title using multiple strategies.
         
         Args:
             doc: PyMuPDF document object
+            page_dicts: Optional cache of parsed page text shared with other extractors
             
         Returns:
             Extracted title or empty string if not found
         """
-        # Strategy 1: PDF metadata
-        title = self._extract_from_metadata(doc)
-        if title:
-            logger.debug(f"Title found in metadata: '{title}'")
-            return title
-        
-        # Strategy 2: Document outline/bookmarks
-        title = self._extract_from_outline(doc)
-        if title:
-            logger.debug(f"Title found in outline: '{title}'")
-            return title
-        
-        # Strategy 3: First page analysis
-        title = self._extract_from_first_page(doc)
-        if title:
-            logger.debug(f"Title found on first page: '{title}'")
-            return title
-        
-        # Strategy 4: Largest font text
-        title = self._extract_by_font_size(doc)
-        if title:
-            logger.debug(f"Title found by font size: '{title}'")
-            return title
-        
-        logger.warning("No title found, returning empty string")
-        return ""
+        if page_dicts is None:
+            page_dicts = PageDictCache(doc)
+        
+        # Formatted spans per page, kept only for the duration of this call
+        self._block_cache = {}
+        try:
+            # Strategy 1: PDF metadata
+            title = self._extract_from_metadata(doc)
+            if title:
+                logger.debug(f"Title found in metadata: '{title}'")
+                return title
+            
+            # Strategy 2: Document outline/bookmarks. The table of contents is
+            # read once; its first entry also serves as a lower-confidence
+            # fallback that makes the font-size scan unnecessary
+            toc = self._get_toc(doc)
+            title = self._extract_from_outline(toc)
+            if title:
+                logger.debug(f"Title found in outline: '{title}'")
+                return title
+            
+            # Strategy 3: First page analysis
+            title = self._extract_from_first_page(doc, page_dicts)
+            if title:
+                logger.debug(f"Title found on first page: '{title}'")
+                return title
+            
+            # Outline fallback: first entry even if it failed the strict checks,
+            # unless it is a heading the other strategies reject as well
+            title = clean_text(toc[0][1]) if toc else ""
+            if (len(title) >= 3 and not self._ignore_re.search(title.lower())
+                    and not is_non_title(title)):
+                logger.debug(f"Using first outline entry as title: '{title}'")
+                return title
+            
+            # Strategy 4: Largest font text
+            title = self._extract_by_font_size(doc, page_dicts)
+            if title:
+                logger.debug(f"Title found by font size: '{title}'")
+                return title
+            
+            logger.warning("No title found, returning empty string")
+            return ""
+        finally:
+            self._block_cache = {}
     
     def _extract_from_metadata(self, doc: fitz.Document) -> Optional[str]:
         """Extract title from PDF metadata."""
@@ -82,15 +119,20 @@ class TitleExtractor:
         
         return None
     
-    def _extract_from_outline(self, doc: fitz.Document) -> Optional[str]:
-        """Extract title from document outline if it has a root title."""
+    def _get_toc(self, doc: fitz.Document) -> List[list]:
+        """Return the document's table of contents, or an empty list on error."""
         try:
-            outline = doc.get_toc()
-            
-            if outline and len(outline) > 0:
+            return doc.get_toc()
+        except Exception as e:
+            logger.debug(f"Error reading table of contents: {str(e)}")
+            return []
+    
+    def _extract_from_outline(self, toc: List[list]) -> Optional[str]:
+        """Extract title from the document outline if it has a root title."""
+        try:
+            if toc:
                 # Look for a potential document title in the first outline item
-                first_item = outline[0]
-                level, title, page = first_item
+                level, title, page = toc[0][:3]
                 
                 # If it's level 1 and seems like a title
                 if level == 1 and is_likely_title(title):
@@ -101,114 +143,110 @@ class TitleExtractor:
         
         return None
     
-    def _extract_from_first_page(self, doc: fitz.Document) -> Optional[str]:
+    def _extract_from_first_page(self, doc: fitz.Document, page_dicts: PageDictCache) -> Optional[str]:
         """Extract title by analyzing the first page."""
         try:
             if doc.page_count == 0:
                 return None
             
-            page = doc[0]
-            text_blocks = self._get_text_blocks_with_formatting(page)
+            text_blocks = self._get_blocks(page_dicts, 0)
             
-            # Look for title-like text in the first page
-            candidates = []
+            # Look for title-like text in the first page, keeping only the
+            # best-scoring candidate seen so far (the first one on ties)
+            best_text = None
+            best_score = 0.0
             
             for block in text_blocks:
-                text = block["text"].strip()
+                text = block.text
                 
                 # Skip very short or very long text
                 if len(text) < 5 or len(text) > 200:
                     continue
                 
                 # Skip common non-title text
-                if any(word.lower() in text.lower() for word in self.ignore_words):
+                if self._ignore_re.search(text.lower()):
                     continue
                 
                 # Check if it looks like a title
                 if is_likely_title(text):
-                    candidates.append({
-                        "text": text,
-                        "font_size": block.get("size", 0),
-                        "y_position": block.get("bbox", [0, 0, 0, 0])[1],
-                        "score": self._calculate_title_score(block)
-                    })
+                    score = self._calculate_title_score(block)
+                    if best_text is None or score > best_score:
+                        best_text = text
+                        best_score = score
             
-            # Sort by score and return the best candidate
-            candidates.sort(key=lambda x: x["score"], reverse=True)
-            
-            if candidates:
-                return clean_text(candidates[0]["text"])
+            if best_text is not None:
+                return clean_text(best_text)
                 
         except Exception as e:
             logger.debug(f"Error extracting title from first page: {str(e)}")
         
         return None
     
-    def _extract_by_font_size(self, doc: fitz.Document) -> Optional[str]:
-        """Find title by looking for the largest font text."""
+    def _extract_by_font_size(self, doc: fitz.Document, page_dicts: PageDictCache) -> Optional[str]:
+        """Find title by looking for the largest font text, page by page."""
         try:
-            max_font_size = 0
-            title_candidates = []
-            
-            # Check first 3 pages
+            # Check first 3 pages, stopping at the first page that yields a title
             for page_num in range(min(3, doc.page_count)):
-                page = doc[page_num]
-                text_blocks = self._get_text_blocks_with_formatting(page)
+                text_blocks = self._get_blocks(page_dicts, page_num)
+                
+                # Largest font first, topmost first among equal sizes
+                text_blocks = sorted(text_blocks, key=lambda b: (-b.size, b.y))
                 
                 for block in text_blocks:
-                    font_size = block.get("size", 0)
-                    text = block["text"].strip()
-                    
-                    if font_size > max_font_size and len(text) > 5 and is_likely_title(text):
-                        max_font_size = font_size
-                        title_candidates = [text]
-                    elif font_size == max_font_size and len(text) > 5 and is_likely_title(text):
-                        title_candidates.append(text)
-            
-            # Return the first (topmost) candidate with the largest font
-            if title_candidates:
-                return clean_text(title_candidates[0])
+                    text = block.text
+                    if len(text) > 5 and is_likely_title(text):
+                        return clean_text(text)
                 
         except Exception as e:
             logger.debug(f"Error extracting title by font size: {str(e)}")
         
         return None
     
-    def _get_text_blocks_with_formatting(self, page: fitz.Page) -> List[Dict[str, Any]]:
-        """Extract text blocks with formatting information."""
+    def _get_blocks(self, page_dicts: PageDictCache, page_num: int) -> List[TextSpan]:
+        """Return the formatted spans of a page, building them at most once per call."""
+        blocks = self._block_cache.get(page_num)
+        if blocks is None:
+            try:
+                page_dict = page_dicts[page_num]
+            except Exception as e:
+                logger.debug(f"Error getting text blocks: {str(e)}")
+                page_dict = {}
+            blocks = self._get_text_blocks_with_formatting(page_dict)
+            self._block_cache[page_num] = blocks
+        return blocks
+    
+    def _get_text_blocks_with_formatting(self, page_dict: Dict[str, Any]) -> List[TextSpan]:
+        """Extract text blocks with formatting information from a page text dictionary."""
         blocks = []
         
-        try:
-            page_dict = page.get_text("dict")
+        # Text extraction errors are handled by the caller; MuPDF always
+        # provides the span keys, so the loop itself runs without a try
+        for block in page_dict.get("blocks", []):
+            if "lines" not in block:
+                continue
             
-            for block in page_dict.get("blocks", []):
-                if "lines" not in block:
-                    continue
-                
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span.get("text", "").strip()
-                        if text:
-                            blocks.append({
-                                "text": text,
-                                "font": span.get("font", ""),
-                                "size": span.get("size", 0),
-                                "flags": span.get("flags", 0),
-                                "bbox": span.get("bbox", []),
-                                "color": span.get("color", 0)
-                            })
-        except Exception as e:
-            logger.debug(f"Error getting text blocks: {str(e)}")
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if not text:
+                        continue
+                    blocks.append(TextSpan(
+                        text,
+                        span["size"],
+                        span["flags"],
+                        span["bbox"][1],
+                        span["font"]
+                    ))
         
         return blocks
     
-    def _calculate_title_score(self, block: Dict[str, Any]) -> float:
+    def _calculate_title_score(self, block: TextSpan) -> float:
         """Calculate a score for how likely a text block is to be a title."""
         score = 0.0
-        text = block["text"]
-        font_size = block.get("size", 0)
-        y_pos = block.get("bbox", [0, 0, 0, 0])[1]
-        flags = block.get("flags", 0)
+        text = block.text
+        font_size = block.size
+        y_pos = block.y
+        flags = block.flags
         
         # Font size factor
         score += font_size * 2
@@ -217,7 +255,7 @@ class TitleExtractor:
         score += max(0, 800 - y_pos) / 10
         
         # Bold text gets bonus
-        if flags & 2**4:  # Bold flag
+        if flags & BOLD_FLAG:
             score += 20
         
         # Length factor (reasonable title length)
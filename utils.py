@@ -3,11 +3,90 @@ Utility functions for PDF processing.
 """
 
 import re
+import heapq
+import string
 import logging
-from typing import Optional, List, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# PyMuPDF span flag marking bold text
+BOLD_FLAG = 1 << 4
+
+# Patterns used by clean_text
+_NONPRINT_RE = re.compile(r'[^\x20-\x7E\u00A0-\uFFFF]')
+_ASCII_NONPRINT_TABLE = dict.fromkeys([*range(0x20), 0x7F])
+_DOTS_RE = re.compile(r'\.{3,}')
+_SPACED_DOTS_RE = re.compile(r'\s*\.\s*\.\s*\.')
+
+# Heading level names indexed by numeric level (index 0 is never used)
+LEVEL_NAMES = ("h1", "h1", "h2", "h3", "h4", "h5", "h6")
+
+# Numeric level of each heading level name; lower numbers are higher levels
+LEVEL_NUMBERS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+# Numbered/lettered heading prefixes, tried in order in a single match;
+# the name of the matching group selects the heading level
+_HEADING_PREFIX_RE = re.compile(
+    r'^(?:(?P<num3>\d+\.\d+\.\d+)'  # 1.1.1 format
+    r'|(?P<num2>\d+\.\d+)'  # 1.1 format
+    r'|(?P<num1>\d+)'  # 1. format
+    r'|(?P<roman>[IVX]+)'  # Roman numerals
+    r'|(?P<letter>[A-Z]\.))'  # A. format
+)
+_HEADING_PREFIX_LEVELS = {"num3": "h3", "num2": "h2", "num1": "h1", "roman": "h1", "letter": "h2"}
+
+# Common non-title patterns (numbers, page numbers, "1 of 10", captions,
+# references, URLs), matched against lowercased text
+_NON_TITLE_RE = re.compile(
+    r'^\d+$|^page\s+\d+|^\d+\s*of\s*\d+|^(?:table|figure|chart|diagram)'
+    r'|^(?:see|refer|note|example)|^(?:http|www|ftp)'
+)
+
+# Common title indicators ("Chapter 1", "1. Title", roman numerals)
+_TITLE_INDICATOR_RE = re.compile(r'^(?:chapter|section|part)\s+\d+|^\d+\.?\s+[A-Z]|^[IVX]+\.?\s+[A-Z]')
+
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+
+
+@lru_cache(maxsize=None)
+def dict_text_flags() -> int:
+    """
+    Return the PyMuPDF flags used for "dict" text extraction: the standard
+    dict flags without image blocks, which carry no text.
+    """
+    import fitz  # PyMuPDF, loaded by the worker initializer
+    return fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+class PageDictCache:
+    """
+    Lazily computes and caches page.get_text("dict") for a document so the
+    title and outline extractors never parse the same page twice.
+    """
+    
+    def __init__(self, doc: Any):
+        self.doc = doc
+        self._page_dicts: Dict[int, Dict[str, Any]] = {}
+    
+    def __getitem__(self, page_num: int) -> Dict[str, Any]:
+        """Return the text dictionary for a 0-based page number."""
+        page_dict = self._page_dicts.get(page_num)
+        if page_dict is None:
+            # MuPDF builds a temporary text page for this call and frees it
+            # afterwards; only the resulting dictionary is kept
+            page_dict = self.doc[page_num].get_text("dict", flags=dict_text_flags())
+            self._page_dicts[page_num] = page_dict
+        return page_dict
+    
+    def pop(self, page_num: int) -> Dict[str, Any]:
+        """Return the text dictionary for a 0-based page number without keeping it cached."""
+        page_dict = self._page_dicts.pop(page_num, None)
+        if page_dict is None:
+            page_dict = self.doc[page_num].get_text("dict", flags=dict_text_flags())
+        return page_dict
+
 
 def clean_text(text: str) -> str:
     """
@@ -22,15 +101,27 @@ def clean_text(text: str) -> str:
     if not isinstance(text, str):
         text = str(text)
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text.strip())
+    return _clean_text(text)
+
+
+@lru_cache(maxsize=4096)
+def _clean_text(text: str) -> str:
+    """Cached implementation of clean_text; running headers repeat across pages."""
+    # Strip and collapse whitespace in a single C-level split/join pass
+    text = ' '.join(text.split())
     
-    # Remove non-printable characters except common ones
-    text = re.sub(r'[^\x20-\x7E\u00A0-\uFFFF]', '', text)
+    # Remove non-printable characters except common ones; ASCII text only
+    # has control characters to drop, which str.translate handles in C
+    if text.isascii():
+        text = text.translate(_ASCII_NONPRINT_TABLE)
+    else:
+        text = _NONPRINT_RE.sub('', text)
     
-    # Remove common PDF artifacts
-    text = re.sub(r'\.{3,}', '...', text)  # Multiple dots
-    text = re.sub(r'\s*\.\s*\.\s*\.', '...', text)  # Spaced dots
+    # Remove common PDF artifacts; both need at least three dots, so most
+    # text skips these passes entirely
+    if text.count('.') >= 3:
+        text = _DOTS_RE.sub('...', text)  # Multiple dots
+        text = _SPACED_DOTS_RE.sub('...', text)  # Spaced dots
     
     return text.strip()
 
@@ -46,8 +137,9 @@ def normalize_level(level: int) -> str:
         Normalized level string (h1, h2, h3, ...)
     """
     # Clamp level between 1 and 6
-    level = max(1, min(6, level))
-    return f"h{level}"
+    if 1 <= level <= 6:
+        return LEVEL_NAMES[level]
+    return "h1" if level < 1 else "h6"
 
 
 def detect_heading_level(text: str, font_size: float, flags: int, avg_font_size: float) -> str:
@@ -63,21 +155,16 @@ def detect_heading_level(text: str, font_size: float, flags: int, avg_font_size:
     Returns:
         Heading level (h1, h2, h3, etc.)
     """
-    text_lower = text.lower()
-    
-    # Check for explicit level indicators
-    if re.match(r'^\d+\.\d+\.\d+', text):  # 1.1.1 format
-        return "h3"
-    elif re.match(r'^\d+\.\d+', text):  # 1.1 format
-        return "h2"
-    elif re.match(r'^\d+\.?', text):  # 1. format
-        return "h1"
-    elif re.match(r'^[IVX]+\.?', text):  # Roman numerals
-        return "h1"
-    elif re.match(r'^[A-Z]\.', text):  # A. format
-        return "h2"
+    # Check for explicit level indicators; they all start with a digit or
+    # an uppercase ASCII letter, so other text skips the regex entirely
+    c0 = text[:1]
+    if c0.isdigit() or 'A' <= c0 <= 'Z':
+        match = _HEADING_PREFIX_RE.match(text)
+        if match:
+            return _HEADING_PREFIX_LEVELS[match.lastgroup]
     
     # Check for keyword indicators
+    text_lower = text.lower()
     if 'chapter' in text_lower or 'part' in text_lower:
         return "h1"
     elif 'section' in text_lower:
@@ -98,6 +185,7 @@ def detect_heading_level(text: str, font_size: float, flags: int, avg_font_size:
         return "h4"
 
 
+@lru_cache(maxsize=4096)
 def is_likely_title(text: str) -> bool:
     """
     Determine if text is likely to be a document title.
@@ -117,44 +205,45 @@ def is_likely_title(text: str) -> bool:
     if len(text) > 200:
         return False
     
+    # Email addresses
+    if '@' in text:
+        return False
+    
     # Common non-title patterns
-    non_title_patterns = [
-        r'^\d+$',  # Just numbers
-        r'^page\s+\d+',  # "Page 1"
-        r'^\d+\s*of\s*\d+',  # "1 of 10"
-        r'^(table|figure|chart|diagram)',  # Captions
-        r'^(see|refer|note|example)',  # References
-        r'^(http|www|ftp)',  # URLs
-        r'@',  # Email addresses
-    ]
-    
-    for pattern in non_title_patterns:
-        if re.search(pattern, text_lower):
-            return False
+    if _NON_TITLE_RE.search(text_lower):
+        return False
     
     # Common title indicators
-    title_indicators = [
-        r'^(chapter|section|part)\s+\d+',  # "Chapter 1"
-        r'^\d+\.?\s+[A-Z]',  # "1. Title" or "1 Title"
-        r'^[IVX]+\.?\s+[A-Z]',  # Roman numerals
-    ]
-    
-    for pattern in title_indicators:
-        if re.search(pattern, text):
-            return True
+    if _TITLE_INDICATOR_RE.search(text):
+        return True
     
     # General characteristics of titles
     # - Starts with capital letter
     # - Not all caps (unless short)
     # - Contains letters
+    # Cheapest checks first: the all-caps scan is only needed for long text
     if (text[0].isupper() and 
-        re.search(r'[a-zA-Z]', text) and 
-        (not text.isupper() or len(text) <= 50)):
+        (len(text) <= 50 or not text.isupper()) and 
+        not _ASCII_LETTERS.isdisjoint(text)):
         return True
     
     return False
 
 
+def is_non_title(text: str) -> bool:
+    """
+    Check text against common non-title patterns (page numbers, captions,
+    references, URLs).
+    
+    Args:
+        text: Text to analyze
+        
+    Returns:
+        True if the text matches a non-title pattern
+    """
+    return _NON_TITLE_RE.search(text.lower()) is not None
+
+
 def filter_outline_items(outline: List[dict], max_items: int = 100) -> List[dict]:
     """
     Filter and limit outline items for performance.
@@ -169,13 +258,11 @@ def filter_outline_items(outline: List[dict], max_items: int = 100) -> List[dict
     if len(outline) <= max_items:
         return outline
     
-    # Keep items with preference for higher levels (h1, h2 over h3, h4, etc.)
-    level_priority = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
-    
-    # Sort by level priority, then by page
-    outline.sort(key=lambda x: (level_priority.get(x["level"], 6), x["page"]))
-    
-    return outline[:max_items]
+    # Keep the top items by level priority, then by page, without sorting
+    # the whole outline; kept items stay in their original order
+    keep = heapq.nsmallest(max_items, range(len(outline)),
+                           key=lambda i: (LEVEL_NUMBERS.get(outline[i]["level"], 6), outline[i]["page"]))
+    return [outline[i] for i in sorted(keep)]
 
 
 def validate_page_number(page: int, max_pages: int) -> int: